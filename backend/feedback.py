@@ -0,0 +1,304 @@
+"""Non-blocking feedback ingestion: bounded queue, batch writer, pluggable sinks."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FeedbackEvent:
+    """A single feedback create ("create") or update ("update") operation."""
+
+    op: str
+    feedback_id: Optional[UUID]
+    run_id: Optional[UUID] = None
+    key: Optional[str] = None
+    score: Union[float, int, bool, None] = None
+    comment: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+
+
+class PartialWriteError(Exception):
+    """Raised by a sink that applied only the first ``written`` events."""
+
+    def __init__(self, written: int, cause: Exception) -> None:
+        super().__init__(f"wrote {written} events before failing: {cause}")
+        self.written = written
+        self.cause = cause
+
+
+class FeedbackSink:
+    """Destination for feedback batches.
+
+    ``write_batch`` is synchronous and is always called off the event loop.
+    It must apply the events in order and raise on failure so the batch can
+    be retried; sinks that are not transactional raise ``PartialWriteError``
+    so only the unwritten tail is retried.
+    """
+
+    def write_batch(self, events: List[FeedbackEvent]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class LangSmithFeedbackSink(FeedbackSink):
+    """Forward feedback to LangSmith through the synchronous client."""
+
+    def __init__(self, client) -> None:
+        self.client = client
+
+    def write_batch(self, events: List[FeedbackEvent]) -> None:
+        for i, event in enumerate(events):
+            try:
+                self._write(event)
+            except Exception as e:
+                raise PartialWriteError(i, e) from e
+
+    def _write(self, event: FeedbackEvent) -> None:
+        if event.op == "create":
+            self.client.create_feedback(
+                event.run_id,
+                event.key,
+                score=event.score,
+                comment=event.comment,
+                feedback_id=event.feedback_id,
+            )
+        else:
+            self.client.update_feedback(
+                event.feedback_id,
+                score=event.score,
+                comment=event.comment,
+            )
+
+
+class SQLFeedbackSink(FeedbackSink):
+    """Store feedback in a local SQL database (Postgres or SQLite).
+
+    Each batch is written in one transaction; consecutive creates are sent
+    as a single ``executemany``. Creates are upserts on ``feedback_id`` so a
+    retried POST does not fail the batch, and updates only touch the fields
+    they carry, like ``Client.update_feedback``.
+    """
+
+    def __init__(self, db_url: str, table_name: str = "feedback") -> None:
+        from sqlalchemy import (
+            Column,
+            DateTime,
+            Float,
+            MetaData,
+            String,
+            Table,
+            Text,
+            create_engine,
+        )
+
+        self.engine = create_engine(db_url, pool_pre_ping=True)
+        self.dialect = self.engine.dialect.name
+        self.metadata = MetaData()
+        self.table = Table(
+            table_name,
+            self.metadata,
+            Column("feedback_id", String(36), primary_key=True),
+            Column("run_id", String(36), index=True),
+            Column("key", String(255)),
+            Column("score", Float, nullable=True),
+            Column("comment", Text, nullable=True),
+            Column("created_at", DateTime),
+            Column("updated_at", DateTime),
+        )
+
+    def create_schema(self) -> None:
+        self.metadata.create_all(self.engine)
+
+    def write_batch(self, events: List[FeedbackEvent]) -> None:
+        from datetime import datetime, timezone
+
+        def _ts(event: FeedbackEvent) -> datetime:
+            return datetime.fromtimestamp(event.created_at, tz=timezone.utc)
+
+        def _score(event: FeedbackEvent) -> Optional[float]:
+            return None if event.score is None else float(event.score)
+
+        if self.dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        elif self.dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            raise NotImplementedError(f"Unsupported dialect {self.dialect}")
+
+        insert_stmt = insert(self.table)
+        upsert = insert_stmt.on_conflict_do_update(
+            index_elements=[self.table.c.feedback_id],
+            set_=dict(
+                run_id=insert_stmt.excluded.run_id,
+                key=insert_stmt.excluded.key,
+                score=insert_stmt.excluded.score,
+                comment=insert_stmt.excluded.comment,
+                updated_at=insert_stmt.excluded.updated_at,
+            ),
+        )
+
+        with self.engine.begin() as conn:
+            pending: List[dict] = []
+            for event in events:
+                if event.op == "create":
+                    # One multi-row upsert may not touch the same row twice.
+                    if str(event.feedback_id) in {r["feedback_id"] for r in pending}:
+                        conn.execute(upsert, pending)
+                        pending = []
+                    pending.append(
+                        {
+                            "feedback_id": str(event.feedback_id),
+                            "run_id": str(event.run_id),
+                            "key": event.key,
+                            "score": _score(event),
+                            "comment": event.comment,
+                            "created_at": _ts(event),
+                            "updated_at": _ts(event),
+                        }
+                    )
+                    continue
+                if pending:
+                    conn.execute(upsert, pending)
+                    pending = []
+                values = {"updated_at": _ts(event)}
+                if event.score is not None:
+                    values["score"] = _score(event)
+                if event.comment is not None:
+                    values["comment"] = event.comment
+                conn.execute(
+                    self.table.update()
+                    .where(self.table.c.feedback_id == str(event.feedback_id))
+                    .values(**values)
+                )
+            if pending:
+                conn.execute(upsert, pending)
+
+    def close(self) -> None:
+        self.engine.dispose()
+
+
+class FeedbackQueue:
+    """Bounded async queue drained by a background batch writer.
+
+    ``submit`` only enqueues, so request handlers never wait on the sink.
+    When the queue is full, ``submit`` waits at most ``put_timeout`` seconds
+    and then reports rejection so the caller can shed load. Batches are
+    flushed when ``batch_size`` events are buffered or ``flush_interval``
+    seconds have passed, and failed writes are retried with exponential
+    backoff. A batch that still fails is retried one event at a time so a
+    single bad event is the only one dropped.
+    """
+
+    def __init__(
+        self,
+        sink: FeedbackSink,
+        maxsize: int = 1000,
+        batch_size: int = 50,
+        flush_interval: float = 1.0,
+        put_timeout: float = 0.05,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ) -> None:
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the writer."""
+        if self._worker is None:
+            return
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+        await asyncio.get_running_loop().run_in_executor(None, self.sink.close)
+
+    async def submit(self, event: FeedbackEvent) -> bool:
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            pass
+        try:
+            await asyncio.wait_for(self._queue.put(event), self.put_timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning("Feedback queue is full, dropping event")
+            return False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            event = await self._queue.get()
+            if event is None:
+                break
+            batch = [event]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                batch.append(event)
+            await self._write(batch)
+
+    async def _write(self, batch: List[FeedbackEvent]) -> None:
+        batch = await self._write_with_retries(batch, self.max_retries)
+        if len(batch) > 1:
+            logger.warning(f"Retrying {len(batch)} feedback events one by one")
+            batch = [
+                event
+                for event in batch
+                if await self._write_with_retries([event], 0)
+            ]
+        if batch:
+            logger.error(f"Dropping {len(batch)} feedback events")
+
+    async def _write_with_retries(
+        self, batch: List[FeedbackEvent], max_retries: int
+    ) -> List[FeedbackEvent]:
+        """Write batch, resuming after events the sink already applied.
+
+        Returns the events that could not be written.
+        """
+        loop = asyncio.get_running_loop()
+        delay = self.backoff
+        for attempt in range(max_retries + 1):
+            try:
+                await loop.run_in_executor(None, self.sink.write_batch, batch)
+                return []
+            except PartialWriteError as e:
+                batch = batch[e.written :]
+                error: Exception = e.cause
+            except Exception as e:
+                error = e
+            if attempt == max_retries:
+                logger.warning(f"Feedback write failed: {error}")
+                return batch
+            logger.warning(f"Feedback write failed ({error}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+        return batch
@@ -1,15 +1,19 @@
 """Load html from files, clean up, split, ingest into Chroma."""
+import asyncio
 import logging
 import os
 import re
+import time
 from pathlib import Path
-from typing import Iterator
+from typing import Any, Iterator, List, Optional, Tuple
 
 from parser import rustore_docs_extractor
+from rate_limiter import AdaptiveRateLimiter, parse_retry_after
+from record_manager import BulkSQLRecordManager
 
 from bs4 import BeautifulSoup, SoupStrainer
 from langchain_community.document_loaders import SitemapLoader
-from langchain.indexes import SQLRecordManager, index
+from langchain.indexes import index
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
 from langchain_core.embeddings import Embeddings
@@ -25,11 +29,30 @@ DATABASE_PORT = "5432"
 DATABASE_USERNAME = "postgres"
 DATABASE_PASSWORD = "hackme"
 DATABASE_NAME = "rustore"
-RECORD_MANAGER_DB_URL = f"postgresql://{DATABASE_USERNAME}:{DATABASE_PASSWORD}@{DATABASE_HOST}:{DATABASE_PORT}/{DATABASE_NAME}"
+RECORD_MANAGER_DB_URL = os.environ.get("RECORD_MANAGER_DB_URL") or f"postgresql://{DATABASE_USERNAME}:{DATABASE_PASSWORD}@{DATABASE_HOST}:{DATABASE_PORT}/{DATABASE_NAME}"
 COLLECTION_NAME = "test_collection"
 
 
 class SitemapLoaderWithChromium(SitemapLoader):
+    def __init__(
+        self,
+        *args: Any,
+        max_requests_per_second: float = 10.0,
+        max_concurrency: int = 8,
+        max_retries: int = 5,
+        **kwargs: Any,
+    ):
+        """Same arguments as SitemapLoader, plus adaptive crawl limits.
+
+        ``requests_per_second`` is the starting per-host rate; it ramps up to
+        ``max_requests_per_second`` while the site keeps up and backs off on
+        429/5xx, slow responses or Retry-After.
+        """
+        super().__init__(*args, **kwargs)
+        self.max_requests_per_second = max_requests_per_second
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+
     def lazy_load(self) -> Iterator[Document]:
         """Load sitemap."""
         if self.is_local:
@@ -56,33 +79,91 @@ class SitemapLoaderWithChromium(SitemapLoader):
                 metadata=self.meta_function(els[i], result, text_content),
             )
 
-    async def _fetch(
-        self, url: str, retries: int = 3, cooldown: int = 2, backoff: float = 1.5
+    async def _fetch_page(
+        self, browser: Any, url: str
+    ) -> Tuple[Optional[int], Optional[float], str]:
+        """Open url in a new tab; return (status, Retry-After seconds, html)."""
+        page = await browser.new_page()
+        try:
+            response = await page.goto(url)
+            if response is None:
+                return None, None, ""
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+            return response.status, retry_after, await page.content()
+        finally:
+            await page.close()
+
+    async def _fetch_with_limiter(
+        self, browser: Any, url: str, limiter: AdaptiveRateLimiter
     ) -> str:
-        """
-        Asynchronously scrape the content of a given URL using Playwright's async API.
-
-        Args:
-            url (str): The URL to scrape.
-
-        Returns:
-            str: The scraped HTML content or an error message if an exception occurs.
+        host = limiter.for_url(url)
+        error: Any = None
+        for attempt in range(self.max_retries):
+            await host.acquire()
+            status, retry_after, html = None, None, ""
+            start = time.monotonic()
+            try:
+                status, retry_after, html = await self._fetch_page(browser, url)
+            except Exception as e:
+                error = e
+            finally:
+                host.release(status, time.monotonic() - start, retry_after)
+            if status is not None and status != 429 and status < 500:
+                return html
+            if status is not None:
+                error = f"HTTP {status}"
+            logger.warning(
+                f"Error fetching {url} with attempt "
+                f"{attempt + 1}/{self.max_retries}: {error}"
+            )
+        if self.continue_on_failure:
+            logger.warning(f"Skipping {url} due to continue_on_failure=True")
+            return ""
+        raise ValueError(f"Error fetching {url}: {error}")
 
-        """
+    async def fetch_all(self, urls: List[str]) -> Any:
+        """Fetch all urls through one browser with adaptive per-host rate limits."""
         from playwright.async_api import async_playwright
 
-        logger.info("Starting scraping...")
-        results = ""
+        limiter = AdaptiveRateLimiter(
+            initial_rate=self.requests_per_second,
+            max_rate=self.max_requests_per_second,
+            max_concurrency=self.max_concurrency,
+        )
+        total = len(urls)
+        done = 0
+        started_at = last_logged_at = time.monotonic()
+
+        async def fetch(url: str) -> str:
+            nonlocal done, last_logged_at
+            result = await self._fetch_with_limiter(browser, url, limiter)
+            done += 1
+            now = time.monotonic()
+            if now - last_logged_at >= 10 or done == total:
+                last_logged_at = now
+                pages_per_sec = done / max(now - started_at, 1e-9)
+                eta = (total - done) / pages_per_sec
+                rates = ", ".join(
+                    f"{h.host}={h.rate:.2f} req/s" for h in limiter.hosts.values()
+                )
+                logger.info(
+                    f"Fetched {done}/{total} pages, {pages_per_sec:.2f} pages/s, "
+                    f"ETA {eta:.0f}s ({rates})"
+                )
+            return result
+
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
             try:
-                page = await browser.new_page()
-                await page.goto(url)
-                results = await page.content()  # Simply get the HTML content
-                logger.info("Content scraped")
-            except Exception as e:
-                results = f"Error: {e}"
-            await browser.close()
+                results = await asyncio.gather(*(fetch(url) for url in urls))
+            finally:
+                await browser.close()
+
+        elapsed = time.monotonic() - started_at
+        logger.info(
+            f"Crawled {total} pages in {elapsed:.0f}s "
+            f"({total / max(elapsed, 1e-9):.2f} pages/s)"
+        )
         return results
 
 
@@ -142,7 +223,9 @@ def load_rustore_docs():
             ),
         },
         meta_function=metadata_extractor,
+        continue_on_failure=True,
         requests_per_second=1,
+        max_requests_per_second=10,
     ).load()
 
 
@@ -161,7 +244,7 @@ def ingest_docs():
         persist_directory='./chroma_data'
     )
 
-    record_manager = SQLRecordManager(
+    record_manager = BulkSQLRecordManager(
         f"chroma/{COLLECTION_NAME}", db_url=RECORD_MANAGER_DB_URL
     )
     record_manager.create_schema()
@@ -178,16 +261,30 @@ def ingest_docs():
         if "title" not in doc.metadata:
             doc.metadata["title"] = ""
 
-    indexing_stats = index(
-        docs_transformed,
-        record_manager,
-        vectorstore,
-        cleanup="full",
-        source_id_key="source",
-        force_update=(os.environ.get("FORCE_UPDATE") or "false").lower() == "true",
-    )
+    started_at = time.perf_counter()
+    try:
+        indexing_stats = index(
+            docs_transformed,
+            record_manager,
+            vectorstore,
+            cleanup="full",
+            source_id_key="source",
+            force_update=(os.environ.get("FORCE_UPDATE") or "false").lower() == "true",
+        )
+    except BaseException:
+        record_manager.abort()
+        raise
+    record_manager.close()
+    elapsed = time.perf_counter() - started_at
+    bookkeeping = record_manager.stats["bookkeeping"]
 
     logger.info(f"Indexing stats: {indexing_stats}")
+    logger.info(
+        f"Indexing took {elapsed:.1f}s: {bookkeeping:.1f}s blocked on bookkeeping, "
+        f"{elapsed - bookkeeping:.1f}s embedding and writing vectors, "
+        f"{record_manager.stats['background_writes']:.1f}s of record writes "
+        "overlapped in the background"
+    )
     num_vecs = len(vectorstore)
     logger.info(
         f"LangChain now has this many vectors: {num_vecs}",
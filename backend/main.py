@@ -2,10 +2,16 @@
 import asyncio
 import os
 from typing import Optional, Union
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import langsmith
 from chain import ChatRequest, answer_chain
+from feedback import (
+    FeedbackEvent,
+    FeedbackQueue,
+    LangSmithFeedbackSink,
+    SQLFeedbackSink,
+)
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from langserve import add_routes
@@ -17,6 +23,13 @@ client = None
 if os.environ.get('LANGCHAIN_API_KEY'):
     client = Client()
 
+# Feedback goes to a local database when FEEDBACK_DB_URL is set
+# (e.g. the docker-compose Postgres or sqlite:///feedback.db),
+# otherwise to LangSmith.
+FEEDBACK_DB_URL = os.environ.get("FEEDBACK_DB_URL")
+
+feedback_queue: Optional[FeedbackQueue] = None
+
 app = FastAPI()
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +49,34 @@ add_routes(
 )
 
 
+@app.on_event("startup")
+async def start_feedback_queue():
+    global feedback_queue
+    if FEEDBACK_DB_URL:
+        sink = SQLFeedbackSink(FEEDBACK_DB_URL)
+        await _arun(sink.create_schema)
+    elif client is not None:
+        sink = LangSmithFeedbackSink(client)
+    else:
+        return
+    feedback_queue = FeedbackQueue(sink)
+    feedback_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_feedback_queue():
+    if feedback_queue is not None:
+        await feedback_queue.stop()
+
+
+async def _submit_feedback(event: FeedbackEvent) -> Optional[dict]:
+    if feedback_queue is None:
+        return {"result": "Feedback is not configured", "code": 503}
+    if not await feedback_queue.submit(event):
+        return {"result": "Feedback queue is full, try again later", "code": 429}
+    return None
+
+
 class SendFeedbackBody(BaseModel):
     run_id: UUID
     key: str = "user_score"
@@ -47,13 +88,18 @@ class SendFeedbackBody(BaseModel):
 
 @app.post("/feedback")
 async def send_feedback(body: SendFeedbackBody):
-    client.create_feedback(
-        body.run_id,
-        body.key,
-        score=body.score,
-        comment=body.comment,
-        feedback_id=body.feedback_id,
+    error = await _submit_feedback(
+        FeedbackEvent(
+            op="create",
+            feedback_id=body.feedback_id or uuid4(),
+            run_id=body.run_id,
+            key=body.key,
+            score=body.score,
+            comment=body.comment,
+        )
     )
+    if error is not None:
+        return error
     return {"result": "posted feedback successfully", "code": 200}
 
 
@@ -71,11 +117,16 @@ async def update_feedback(body: UpdateFeedbackBody):
             "result": "No feedback ID provided",
             "code": 400,
         }
-    client.update_feedback(
-        feedback_id,
-        score=body.score,
-        comment=body.comment,
+    error = await _submit_feedback(
+        FeedbackEvent(
+            op="update",
+            feedback_id=feedback_id,
+            score=body.score,
+            comment=body.comment,
+        )
     )
+    if error is not None:
+        return error
     return {"result": "patched feedback successfully", "code": 200}
 
 
@@ -84,12 +135,13 @@ async def _arun(func, *args, **kwargs):
 
 
 async def aget_trace_url(run_id: str) -> str:
+    # The run may not be visible in LangSmith yet; back off exponentially.
     for i in range(5):
         try:
             await _arun(client.read_run, run_id)
             break
         except langsmith.utils.LangSmithError:
-            await asyncio.sleep(1 ** i)
+            await asyncio.sleep(min(0.25 * 2**i, 4))
 
     if await _arun(client.run_is_shared, run_id):
         return await _arun(client.read_run_shared_link, run_id)
@@ -0,0 +1,135 @@
+"""Adaptive per-host rate limiting for the docs scraper."""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the Retry-After delay in seconds (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostRateLimiter:
+    """Token bucket for a single host with an AIMD-adjusted refill rate.
+
+    Every fast, successful response adds ``increase / max_rate`` requests/sec.
+    On 429/5xx, errors or responses slower than ``slow_threshold`` seconds the
+    rate is multiplied by ``decrease``, at most once per window: requests
+    issued before the last decrease do not decrease it again. A Retry-After
+    header pauses the host entirely until it expires.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        initial_rate: float = 1.0,
+        min_rate: float = 0.2,
+        max_rate: float = 10.0,
+        max_concurrency: int = 8,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        slow_threshold: float = 5.0,
+    ) -> None:
+        self.host = host
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_threshold = slow_threshold
+        self.tokens = 1.0
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.decreased_at = 0.0
+        self._lock = asyncio.Lock()
+        self._concurrency = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def burst(self) -> float:
+        return max(1.0, self.rate)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait for a concurrency slot and a token."""
+        await self._concurrency.acquire()
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    if now < self.paused_until:
+                        await asyncio.sleep(self.paused_until - now)
+                        continue
+                    self._refill(now)
+                    if self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        return
+                    await asyncio.sleep((1.0 - self.tokens) / self.rate)
+        except BaseException:
+            self._concurrency.release()
+            raise
+
+    def release(
+        self,
+        status: Optional[int],
+        elapsed: float,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Free the slot and adapt the rate to how the request went.
+
+        ``status`` is None when the request failed without a response.
+        """
+        self._concurrency.release()
+        now = time.monotonic()
+        throttled = status is None or status == 429 or status >= 500
+        if throttled or elapsed > self.slow_threshold:
+            if now - elapsed >= self.decreased_at:
+                self._decrease(now, status, elapsed)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.max_rate)
+        if retry_after is not None:
+            self.paused_until = max(self.paused_until, now + retry_after)
+            logger.info(f"{self.host} asked to retry after {retry_after:.1f}s")
+
+    def _decrease(self, now: float, status: Optional[int], elapsed: float) -> None:
+        self.decreased_at = now
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.tokens = min(self.tokens, 0.0)
+        logger.info(
+            f"Backing off {self.host}: status={status}, "
+            f"elapsed={elapsed:.1f}s, rate={self.rate:.2f} req/s"
+        )
+
+
+class AdaptiveRateLimiter:
+    """Keeps one ``HostRateLimiter`` per host."""
+
+    def __init__(self, **host_kwargs) -> None:
+        self.host_kwargs = host_kwargs
+        self.hosts: Dict[str, HostRateLimiter] = {}
+
+    def for_url(self, url: str) -> HostRateLimiter:
+        host = urlparse(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = HostRateLimiter(host, **self.host_kwargs)
+        return self.hosts[host]
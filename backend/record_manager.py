@@ -0,0 +1,180 @@
+"""Record manager that keeps index() bookkeeping off the embedding path."""
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
+
+from langchain.indexes import SQLRecordManager
+from langchain.indexes._sql_record_manager import UpsertionRecord
+
+logger = logging.getLogger(__name__)
+
+
+class BulkSQLRecordManager(SQLRecordManager):
+    """SQLRecordManager with cached lookups and write-behind bulk upserts.
+
+    * All keys of the namespace are read once, so ``exists`` needs no
+      round-trip per batch.
+    * ``update`` hands the batch to a single background writer that upserts
+      it with one ``executemany`` in one transaction, while ``index()`` moves
+      on to embedding the next batch.
+    * Pending writes are flushed before ``list_keys``/``delete_keys`` so the
+      cleanup scan never sees stale timestamps.
+    * Timestamps come from the database clock, read once and advanced with
+      the local monotonic clock.
+
+    Works with Postgres and with an embedded SQLite file
+    (``sqlite:///record_manager.db``) for single-node deployments. A SQLite
+    ``engine=`` passed in may not allow use from other threads, so its
+    upserts are written inline instead of in the background.
+    """
+
+    def __init__(self, namespace: str, **kwargs: Any) -> None:
+        db_url = kwargs.get("db_url")
+        if db_url is not None and str(db_url).startswith("sqlite"):
+            engine_kwargs = dict(kwargs.get("engine_kwargs") or {})
+            connect_args = dict(engine_kwargs.get("connect_args") or {})
+            # The background writer uses the engine from another thread.
+            connect_args.setdefault("check_same_thread", False)
+            engine_kwargs["connect_args"] = connect_args
+            kwargs["engine_kwargs"] = engine_kwargs
+        super().__init__(namespace, **kwargs)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if db_url is not None or self.dialect != "sqlite":
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending: List[Future] = []
+        self._known_keys: Optional[Set[str]] = None
+        self._clock_offset: Optional[float] = None
+        self.stats: Dict[str, float] = {"bookkeeping": 0.0, "background_writes": 0.0}
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stats[name] += time.perf_counter() - start
+
+    def get_time(self) -> float:
+        if self._clock_offset is None:
+            with self._timed("bookkeeping"):
+                self._clock_offset = super().get_time() - time.monotonic()
+        return self._clock_offset + time.monotonic()
+
+    def _load_keys(self) -> Set[str]:
+        if self._known_keys is None:
+            with self._make_session() as session:
+                rows = session.query(UpsertionRecord.key).filter(
+                    UpsertionRecord.namespace == self.namespace
+                )
+                self._known_keys = {row.key for row in rows}
+        return self._known_keys
+
+    def exists(self, keys: Sequence[str]) -> List[bool]:
+        with self._timed("bookkeeping"):
+            known_keys = self._load_keys()
+        return [key in known_keys for key in keys]
+
+    def update(
+        self,
+        keys: Sequence[str],
+        *,
+        group_ids: Optional[Sequence[Optional[str]]] = None,
+        time_at_least: Optional[float] = None,
+    ) -> None:
+        """Queue an upsert of the keys for the background writer."""
+        if group_ids is None:
+            group_ids = [None] * len(keys)
+
+        if len(keys) != len(group_ids):
+            raise ValueError(
+                f"Number of keys ({len(keys)}) does not match number of "
+                f"group_ids ({len(group_ids)})"
+            )
+
+        update_time = self.get_time()
+        if time_at_least and update_time < time_at_least:
+            # Safeguard against time sync issues
+            raise AssertionError(f"Time sync issue: {update_time} < {time_at_least}")
+
+        records = [
+            {
+                "key": key,
+                "namespace": self.namespace,
+                "updated_at": update_time,
+                "group_id": group_id,
+            }
+            for key, group_id in zip(keys, group_ids)
+        ]
+        if not records:
+            return
+        with self._timed("bookkeeping"):
+            self._load_keys().update(keys)
+            if self._executor is None:
+                self._upsert(records)
+            else:
+                self._pending.append(self._executor.submit(self._upsert, records))
+
+    def _upsert(self, records: List[dict]) -> None:
+        if self.dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        elif self.dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            raise NotImplementedError(f"Unsupported dialect {self.dialect}")
+
+        with self._timed("background_writes"):
+            insert_stmt = insert(UpsertionRecord)
+            stmt = insert_stmt.on_conflict_do_update(
+                index_elements=[UpsertionRecord.key, UpsertionRecord.namespace],
+                set_=dict(
+                    updated_at=insert_stmt.excluded.updated_at,
+                    group_id=insert_stmt.excluded.group_id,
+                ),
+            )
+            with self._make_session() as session:
+                session.execute(stmt, records)
+                session.commit()
+
+    def flush(self) -> None:
+        """Wait for queued upserts; re-raise the first failure."""
+        with self._timed("bookkeeping"):
+            pending, self._pending = self._pending, []
+            for future in pending:
+                future.result()
+
+    def list_keys(self, **kwargs: Any) -> List[str]:
+        self.flush()
+        with self._timed("bookkeeping"):
+            return super().list_keys(**kwargs)
+
+    def delete_keys(self, keys: Sequence[str]) -> None:
+        self.flush()
+        with self._timed("bookkeeping"):
+            super().delete_keys(keys)
+            if self._known_keys is not None:
+                self._known_keys.difference_update(keys)
+
+    def close(self) -> None:
+        """Flush queued upserts and stop the background writer."""
+        try:
+            self.flush()
+        finally:
+            self._shutdown()
+
+    def abort(self) -> None:
+        """Stop after a failed run, logging write errors instead of raising.
+
+        Use this when ``index()`` raised, so its exception is not replaced.
+        """
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to write index records")
+        finally:
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
@@ -0,0 +1,164 @@
+import asyncio
+import importlib.util
+import os
+import tempfile
+import unittest
+from uuid import uuid4
+
+from feedback import (
+    FeedbackEvent,
+    FeedbackQueue,
+    FeedbackSink,
+    LangSmithFeedbackSink,
+    SQLFeedbackSink,
+)
+
+HAS_SQLALCHEMY = importlib.util.find_spec("sqlalchemy") is not None
+
+
+class FakeSink(FeedbackSink):
+    def __init__(self, failures: int = 0, bad_ids=()) -> None:
+        self.batches = []
+        self.failures = failures
+        self.bad_ids = set(bad_ids)
+
+    def write_batch(self, events):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("sink unavailable")
+        if any(event.feedback_id in self.bad_ids for event in events):
+            raise RuntimeError("bad event")
+        self.batches.append([event.feedback_id for event in events])
+
+
+class FakeLangSmithClient:
+    def __init__(self, fail_on=None) -> None:
+        self.created = []
+        self.fail_on = fail_on
+
+    def create_feedback(self, run_id, key, *, score, comment, feedback_id):
+        if feedback_id == self.fail_on:
+            self.fail_on = None
+            raise RuntimeError("timeout")
+        if feedback_id in self.created:
+            raise RuntimeError("duplicate feedback_id")
+        self.created.append(feedback_id)
+
+    def update_feedback(self, feedback_id, *, score, comment):
+        pass
+
+
+def create(feedback_id=None, **kwargs) -> FeedbackEvent:
+    return FeedbackEvent(
+        op="create", feedback_id=feedback_id or uuid4(), run_id=uuid4(), **kwargs
+    )
+
+
+def fast_queue(sink, **kwargs) -> FeedbackQueue:
+    kwargs.setdefault("flush_interval", 0.05)
+    kwargs.setdefault("backoff", 0.001)
+    return FeedbackQueue(sink, **kwargs)
+
+
+class FeedbackQueueTest(unittest.IsolatedAsyncioTestCase):
+    async def test_flushes_by_size(self):
+        sink = FakeSink()
+        queue = fast_queue(sink, batch_size=3, flush_interval=10)
+        queue.start()
+        for _ in range(6):
+            await queue.submit(create())
+        await asyncio.sleep(0.05)
+        self.assertEqual([len(batch) for batch in sink.batches], [3, 3])
+        await queue.stop()
+
+    async def test_flushes_by_interval(self):
+        sink = FakeSink()
+        queue = fast_queue(sink, batch_size=100)
+        queue.start()
+        await queue.submit(create())
+        await queue.submit(create())
+        await asyncio.sleep(0.2)
+        self.assertEqual([len(batch) for batch in sink.batches], [2])
+        await queue.stop()
+
+    async def test_full_queue_rejects(self):
+        queue = fast_queue(FakeSink(), maxsize=2, put_timeout=0.01)
+        # Not started, so nothing drains the queue.
+        self.assertTrue(await queue.submit(create()))
+        self.assertTrue(await queue.submit(create()))
+        self.assertFalse(await queue.submit(create()))
+
+    async def test_retries_transient_failures(self):
+        sink = FakeSink(failures=2)
+        queue = fast_queue(sink)
+        queue.start()
+        await queue.submit(create())
+        await queue.stop()
+        self.assertEqual(len(sink.batches), 1)
+
+    async def test_drops_only_the_bad_event(self):
+        bad = create()
+        good = [create() for _ in range(3)]
+        sink = FakeSink(bad_ids={bad.feedback_id})
+        queue = fast_queue(sink, max_retries=1)
+        queue.start()
+        for event in [good[0], bad, *good[1:]]:
+            await queue.submit(event)
+        await queue.stop()
+        written = [feedback_id for batch in sink.batches for feedback_id in batch]
+        self.assertEqual(written, [event.feedback_id for event in good])
+
+    async def test_langsmith_retry_resumes_after_written_events(self):
+        events = [create() for _ in range(3)]
+        client = FakeLangSmithClient(fail_on=events[1].feedback_id)
+        queue = fast_queue(LangSmithFeedbackSink(client))
+        queue.start()
+        for event in events:
+            await queue.submit(event)
+        await queue.stop()
+        self.assertEqual(client.created, [event.feedback_id for event in events])
+
+
+@unittest.skipUnless(HAS_SQLALCHEMY, "sqlalchemy is not installed")
+class SQLFeedbackSinkTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.sink = SQLFeedbackSink(f"sqlite:///{self.path}")
+        self.sink.create_schema()
+
+    def tearDown(self):
+        self.sink.close()
+        os.remove(self.path)
+
+    def rows(self):
+        from sqlalchemy import select
+
+        with self.sink.engine.connect() as conn:
+            return {
+                row.feedback_id: row
+                for row in conn.execute(select(self.sink.table))
+            }
+
+    def test_duplicate_create_is_idempotent(self):
+        first = create(score=1)
+        others = [create() for _ in range(3)]
+        retried = create(first.feedback_id, score=0)
+        self.sink.write_batch([first, *others, retried])
+        rows = self.rows()
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[str(first.feedback_id)].score, 0)
+
+    def test_update_keeps_fields_it_does_not_carry(self):
+        event = create(score=1, comment="keep me")
+        self.sink.write_batch([event])
+        self.sink.write_batch(
+            [FeedbackEvent(op="update", feedback_id=event.feedback_id, score=0)]
+        )
+        row = self.rows()[str(event.feedback_id)]
+        self.assertEqual(row.score, 0)
+        self.assertEqual(row.comment, "keep me")
+
+
+if __name__ == "__main__":
+    unittest.main()
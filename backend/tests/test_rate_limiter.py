@@ -0,0 +1,45 @@
+import asyncio
+import unittest
+
+from rate_limiter import HostRateLimiter, parse_retry_after
+
+
+class HostRateLimiterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_success_after_backoff_ramps_gradually(self):
+        limiter = HostRateLimiter("x", initial_rate=0.2, max_rate=10)
+        limiter.release(200, 0.01)
+        self.assertAlmostEqual(limiter.rate, 0.3)
+
+    async def test_concurrent_failures_decrease_once(self):
+        limiter = HostRateLimiter("x", initial_rate=10, max_rate=10)
+        for _ in range(8):
+            limiter.release(429, 0.5)
+        self.assertEqual(limiter.rate, 5)
+
+    async def test_requests_after_decrease_can_decrease_again(self):
+        limiter = HostRateLimiter("x", initial_rate=10, max_rate=10)
+        limiter.release(503, 0.0)
+        await asyncio.sleep(0.01)
+        limiter.release(503, 0.0)
+        self.assertEqual(limiter.rate, 2.5)
+
+    async def test_retry_after_pauses_host(self):
+        limiter = HostRateLimiter("x", initial_rate=10)
+        await limiter.acquire()
+        limiter.release(429, 0.0, retry_after=0.1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await limiter.acquire()
+        self.assertGreaterEqual(loop.time() - start, 0.09)
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+    def test_parses_seconds_and_dates(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
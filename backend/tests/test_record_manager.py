@@ -0,0 +1,55 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+HAS_LANGCHAIN = importlib.util.find_spec("langchain") is not None
+
+
+@unittest.skipUnless(HAS_LANGCHAIN, "langchain is not installed")
+class BulkSQLRecordManagerTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.db_url = f"sqlite:///{self.path}"
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_sqlite_url_with_explicit_engine_kwargs_none(self):
+        from record_manager import BulkSQLRecordManager
+
+        manager = BulkSQLRecordManager("ns", db_url=self.db_url, engine_kwargs=None)
+        manager.create_schema()
+        manager.update(["a", "b"])
+        manager.close()
+        self.assertEqual(sorted(manager.list_keys()), ["a", "b"])
+
+    def test_sqlite_engine_writes_inline(self):
+        from record_manager import BulkSQLRecordManager
+        from sqlalchemy import create_engine
+
+        manager = BulkSQLRecordManager("ns", engine=create_engine(self.db_url))
+        manager.create_schema()
+        manager.update(["a"])
+        self.assertEqual(manager.list_keys(), ["a"])
+        self.assertEqual(manager.exists(["a", "b"]), [True, False])
+        manager.close()
+
+    def test_abort_logs_write_errors(self):
+        from record_manager import BulkSQLRecordManager
+
+        from langchain.indexes._sql_record_manager import UpsertionRecord
+
+        manager = BulkSQLRecordManager("ns", db_url=self.db_url)
+        manager.create_schema()
+        manager.exists(["a"])
+        # Drop the table so the background upsert fails.
+        UpsertionRecord.__table__.drop(manager.engine)
+        manager.update(["a"])
+        with self.assertLogs("record_manager", "ERROR"):
+            manager.abort()
+
+
+if __name__ == "__main__":
+    unittest.main()